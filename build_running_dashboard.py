@@ -0,0 +1,877 @@
+#!/usr/bin/env python3
+"""Build pages/running.html from my running log CSV.
+
+Reads data/running_log.csv (exported from my watch app, sometimes saved as
+cp949 on Windows) and writes a single self-contained HTML page with the data
+embedded as JSON and Plotly charts, so it works on GitHub Pages with no
+backend.
+
+Usage: python build_running_dashboard.py [csv_path] [out_path] [--encoding=cp949]
+"""
+import base64
+import gzip
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    from charset_normalizer import from_bytes as _cn_from_bytes
+except ImportError:  # pragma: no cover - optional dependency
+    _cn_from_bytes = None
+
+try:
+    import pyarrow  # noqa: F401 - only probed for availability
+    _HAS_PYARROW = True
+except ImportError:  # pragma: no cover - optional dependency
+    _HAS_PYARROW = False
+
+
+def _read_csv_bytes(raw, enc):
+    """Parse CSV bytes, using the multithreaded pyarrow engine when present."""
+    if _HAS_PYARROW:
+        # pyarrow reads utf-8 natively; transcode anything else up front.
+        if enc.lower().replace("-", "_") not in ("utf_8", "utf_8_sig", "ascii"):
+            raw = raw.decode(enc).encode("utf-8")
+            enc = "utf-8"
+        return pd.read_csv(io.BytesIO(raw), encoding=enc, engine="pyarrow")
+    return pd.read_csv(io.BytesIO(raw), encoding=enc)
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_CSV = ROOT / "data" / "running_log.csv"
+DEFAULT_OUT = ROOT / "pages" / "running.html"
+
+TYPE_RPE_DEFAULT = {
+    "easy": 5,
+    "long": 6,
+    "tempo": 7,
+    "interval": 8,
+    "race": 9,
+    "test": 6,
+    "rest": 2,
+}
+
+
+def dumps_json(obj):
+    """Serialize a payload for embedding; orjson when available, stdlib otherwise."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+def detect_and_read_csv(path, encoding=None):
+    """Pick the encoding from a cheap sniff of the raw bytes, then parse once.
+
+    An explicit `encoding` skips detection entirely.
+    """
+    raw = Path(path).read_bytes()
+    if encoding:
+        return _read_csv_bytes(raw, encoding)
+    if raw.startswith(b"\xef\xbb\xbf"):
+        return _read_csv_bytes(raw, "utf-8-sig")
+    # Valid-UTF8 check on the head settles the common case without any
+    # discarded parse attempts.
+    head = raw[:8192]
+    try:
+        head.decode("utf-8")
+        return _read_csv_bytes(raw, "utf-8")
+    except UnicodeDecodeError as e:
+        # A multibyte sequence split at the window edge is not evidence
+        # against UTF-8; confirm with a full decode before giving up,
+        # otherwise valid files would fall through to the cp949 probes.
+        if len(raw) > len(head) and e.start >= len(head) - 3:
+            try:
+                raw.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+            else:
+                return _read_csv_bytes(raw, "utf-8")
+    if _cn_from_bytes is not None:
+        best = _cn_from_bytes(raw[:65536]).best()
+        if best and best.encoding:
+            return _read_csv_bytes(raw, best.encoding)
+    last_err = None
+    for enc in ("cp949", "euc-kr", "latin-1"):
+        try:
+            return _read_csv_bytes(raw, enc)
+        except (UnicodeDecodeError, ValueError) as e:
+            last_err = e
+    raise RuntimeError(f"could not read {path}: {last_err}")
+
+
+def parse_pace_mmss_to_minutes(x):
+    """'5:30' -> 5.5; plain numbers pass through; anything else -> NaN.
+
+    Scalar fallback; main() uses the vectorized equivalent.
+    """
+    if x is None or (isinstance(x, float) and np.isnan(x)):
+        return np.nan
+    s = str(x).strip()
+    try:
+        return float(s)
+    except ValueError:
+        pass
+    mm, sep, ss = s.partition(":")
+    mm, ss = mm.strip(), ss.strip()
+    if sep and mm.isdigit() and ss.isdigit() and len(mm) <= 2 and len(ss) <= 2:
+        sec = int(ss)
+        if sec < 60:
+            return int(mm) + sec / 60.0
+    return np.nan
+
+
+def impute_with_medians(df, col, meds, by="type"):
+    """Fill missing values from a shared per-type median table, then the global median."""
+    return (df[col]
+            .fillna(df[by].map(meds[col]))
+            .fillna(np.nanmedian(df[col].to_numpy(dtype=float))))
+
+
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Running Log</title>
+<script src="https://cdn.plot.ly/plotly-2.32.0.min.js"></script>
+<style>
+  body { font-family: 'Helvetica Neue', Arial, sans-serif; margin: 0; background: #fafafa; color: #222; }
+  header { padding: 16px 24px; background: #1f3b4d; color: #fff; }
+  header h1 { margin: 0; font-size: 20px; }
+  #controls { display: flex; flex-wrap: wrap; gap: 12px; align-items: end; padding: 12px 24px; background: #fff; border-bottom: 1px solid #ddd; }
+  #controls label { display: flex; flex-direction: column; font-size: 12px; gap: 4px; }
+  #controls select, #controls input { padding: 4px 6px; font-size: 13px; }
+  #controls button { padding: 6px 14px; font-size: 13px; cursor: pointer; }
+  #charts { display: grid; grid-template-columns: repeat(auto-fit, minmax(420px, 1fr)); gap: 16px; padding: 16px 24px; }
+  .chart { background: #fff; border: 1px solid #e0e0e0; border-radius: 6px; min-height: 320px; }
+  #noteBox { margin: 0 24px 24px; padding: 10px 14px; background: #fff; border: 1px solid #e0e0e0; border-radius: 6px; font-size: 13px; min-height: 18px; color: #444; }
+</style>
+</head>
+<body>
+<header><h1 id="pageTitle">Running Log</h1></header>
+<div id="controls">
+  <label><span id="lblType">Type</span><select id="typeSelect"></select></label>
+  <label><span id="lblFrom">From</span><input type="date" id="fromInput"></label>
+  <label><span id="lblTo">To</span><input type="date" id="toInput"></label>
+  <label><span id="lblPaceMode">Pace axis</span>
+    <select id="paceModeSel"><option value="pace">min/km</option><option value="speed">km/h</option></select></label>
+  <label><span id="lblRollStat">Rolling stat</span>
+    <select id="rollStatSel"><option value="mean">mean</option><option value="median">median</option></select></label>
+  <label><span id="lblRollWin">Window</span>
+    <select id="rollWinSel"><option value="7">7d</option><option value="14">14d</option><option value="28">28d</option></select></label>
+  <label><span id="lblGoal">Weekly goal (km)</span><input type="number" id="goalInput" value="30" min="0" step="5"></label>
+  <label><span id="lblLang">Language</span>
+    <select id="langSel"><option value="ko">한국어</option><option value="en">English</option></select></label>
+  <button id="applyBtn">Apply</button>
+</div>
+<div id="charts">
+  <div class="chart" id="distDaily"></div>
+  <div class="chart" id="paceDaily"></div>
+  <div class="chart" id="rpeDaily"></div>
+  <div class="chart" id="efficiency"></div>
+  <div class="chart" id="histPace"></div>
+  <div class="chart" id="histHr"></div>
+  <div class="chart" id="boxByType"></div>
+  <div class="chart" id="weeklyDist"></div>
+</div>
+<div id="noteBox"></div>
+<script>
+// DAILY dominates the page size, so it is embedded gzip+base64 and
+// inflated via DecompressionStream before the first render.
+const DAILY_B64 = "__DAILY_B64__";
+let DAILY;
+const WEEKLY = __WEEKLY__;
+const BOX_DATA = __BOX__;
+// Derived arrays for the default controls, precomputed at build time so the
+// first paint skips derive() entirely.
+const INIT = __INIT__;
+const HIST_BINS = __HIST_BINS__;
+const BASE_DATE = "__BASE_DATE__";
+const BASE_MS = Date.parse(BASE_DATE);
+const DAY_MS = 86400000;
+
+function dateStr(i){ return new Date(BASE_MS + i * DAY_MS).toISOString().slice(0, 10); }
+function dayIdxOf(s){ return Math.round((Date.parse(s) - BASE_MS) / DAY_MS); }
+
+function b64Bytes(s){ return Uint8Array.from(atob(s), c => c.charCodeAt(0)); }
+function b64ToF32(s){ return new Float32Array(b64Bytes(s).buffer); }
+function b64ToI32(s){ return new Int32Array(b64Bytes(s).buffer); }
+function b64ToI8(s){ return new Int8Array(b64Bytes(s).buffer); }
+function typeOf(i){ return DAILY.type_names[DAILY.type_codes[i]]; }
+
+const STR = {
+  ko: {
+    title: "러닝 기록", type: "종류", from: "시작", to: "끝", paceMode: "페이스 축",
+    rollStat: "이동 통계", rollWin: "기간", goal: "주간 목표 (km)", lang: "언어", apply: "적용",
+    all: "전체", dist: "일일 거리 (km)", roll: "이동", pace: "페이스 (min/km)", speed: "속도 (km/h)",
+    rpe: "운동 강도 (RPE)", eff: "효율 (속도/심박)", histPace: "페이스 분포", histHr: "심박 분포",
+    box: "종류별 페이스", weekly: "주간 거리 (km)", goalLine: "목표선", clickHint: "포인트를 클릭하면 메모가 표시됩니다."
+  },
+  en: {
+    title: "Running Log", type: "Type", from: "From", to: "To", paceMode: "Pace axis",
+    rollStat: "Rolling stat", rollWin: "Window", goal: "Weekly goal (km)", lang: "Language", apply: "Apply",
+    all: "All", dist: "Daily distance (km)", roll: "rolling", pace: "Pace (min/km)", speed: "Speed (km/h)",
+    rpe: "Effort (RPE)", eff: "Efficiency (speed/HR)", histPace: "Pace distribution", histHr: "HR distribution",
+    box: "Pace by type", weekly: "Weekly distance (km)", goalLine: "goal", clickHint: "Click a point to see its note."
+  }
+};
+let LANG = 'ko';
+
+const typeSelect = document.getElementById('typeSelect');
+const fromInput = document.getElementById('fromInput');
+const toInput = document.getElementById('toInput');
+const paceModeSel = document.getElementById('paceModeSel');
+const rollStatSel = document.getElementById('rollStatSel');
+const rollWinSel = document.getElementById('rollWinSel');
+const goalInput = document.getElementById('goalInput');
+const langSel = document.getElementById('langSel');
+const noteBox = document.getElementById('noteBox');
+
+const types = __TYPES__;
+const DATE_MIN = "__DATE_MIN__";
+const DATE_MAX = "__DATE_MAX__";
+
+function fillTypeSelect(){
+  const cur = typeSelect.value || '__ALL__';
+  typeSelect.innerHTML = '';
+  const optAll = document.createElement('option');
+  optAll.value = '__ALL__'; optAll.textContent = STR[LANG].all;
+  typeSelect.appendChild(optAll);
+  for (const t of types){
+    const o = document.createElement('option');
+    o.value = t; o.textContent = t;
+    typeSelect.appendChild(o);
+  }
+  typeSelect.value = cur;
+}
+fillTypeSelect();
+fromInput.value = DATE_MIN;
+toInput.value = DATE_MAX;
+
+function isNum(v){ return v != null && !Number.isNaN(v); }
+
+function rollingMean(values, window){
+  // Incremental running sum: O(1) per step instead of slicing the window.
+  const out = new Float64Array(values.length);
+  let sum = 0, valid = 0;
+  for (let i = 0; i < values.length; i++){
+    const v = values[i];
+    if (isNum(v)){ sum += v; valid++; }
+    const j = i - window;
+    if (j >= 0 && isNum(values[j])){ sum -= values[j]; valid--; }
+    out[i] = valid ? sum / valid : NaN;
+  }
+  return out;
+}
+
+function bisect(arr, v){
+  let lo = 0, hi = arr.length;
+  while (lo < hi){
+    const mid = (lo + hi) >> 1;
+    if (arr[mid] < v) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+}
+
+function rollingMedian(values, window){
+  // Sorted window kept up to date by binary-search insert/remove: O(log W)
+  // search + O(W) splice per step, instead of re-sorting the window.
+  const out = new Float64Array(values.length);
+  const win = [];
+  for (let i = 0; i < values.length; i++){
+    const v = values[i];
+    if (isNum(v)) win.splice(bisect(win, v), 0, v);
+    const j = i - window;
+    if (j >= 0 && isNum(values[j])) win.splice(bisect(win, values[j]), 1);
+    out[i] = win.length ? win[Math.floor(win.length / 2)] : NaN;
+  }
+  return out;
+}
+
+function rolling(values, window, stat){
+  return stat === 'median' ? rollingMedian(values, window) : rollingMean(values, window);
+}
+
+// Past this many points the SVG/GL traces get visibly sluggish; downsample.
+const LTTB_N = 1500;
+
+function lttb(xs, ys, threshold){
+  // Largest-Triangle-Three-Buckets: pick `threshold` points preserving shape.
+  const n = xs.length;
+  const outX = [xs[0]], outY = [ys[0]], outI = [0];
+  const every = (n - 2) / (threshold - 2);
+  let a = 0;
+  for (let i = 0; i < threshold - 2; i++){
+    const rs = Math.floor((i + 1) * every) + 1;
+    const re = Math.min(Math.floor((i + 2) * every) + 1, n);
+    let avgX = 0, avgY = 0, c = 0;
+    for (let j = rs; j < re; j++){
+      if (!isNum(ys[j])) continue;
+      avgX += xs[j]; avgY += ys[j]; c++;
+    }
+    if (c){ avgX /= c; avgY /= c; }
+    const bs = Math.floor(i * every) + 1;
+    const be = Math.min(Math.floor((i + 1) * every) + 1, n);
+    const ax = xs[a], ay = isNum(ys[a]) ? ys[a] : 0;
+    let maxArea = -1, maxIdx = bs;
+    for (let j = bs; j < be; j++){
+      const y = isNum(ys[j]) ? ys[j] : 0;
+      const area = Math.abs((ax - avgX) * (y - ay) - (ax - xs[j]) * (avgY - ay));
+      if (area > maxArea){ maxArea = area; maxIdx = j; }
+    }
+    outX.push(xs[maxIdx]); outY.push(ys[maxIdx]); outI.push(maxIdx);
+    a = maxIdx;
+  }
+  outX.push(xs[n - 1]); outY.push(ys[n - 1]); outI.push(n - 1);
+  return [outX, outY, outI];
+}
+
+function binCenters(hb){
+  if (!hb.centers){
+    hb.centers = new Array(hb.n);
+    for (let i = 0; i < hb.n; i++) hb.centers[i] = hb.start + (i + 0.5) * hb.size;
+  }
+  return hb.centers;
+}
+
+function ensureXNum(dv){
+  if (!dv.xNum) dv.xNum = dv.x.map(s => Date.parse(s));
+  return dv.xNum;
+}
+
+function maybeDs(dv, y){
+  // cd carries the original DAILY row index per point, so the click
+  // handler stays correct even after downsampling drops points.
+  if (y.length <= LTTB_N) return { x: dv.x, y, cd: dv.idx };
+  const [dx, dy, di] = lttb(ensureXNum(dv), y, LTTB_N);
+  return { x: dx.map(ms => new Date(ms)), y: dy, cd: di.map(j => dv.idx[j]) };
+}
+
+// Which derived arrays feed each zoomable time-series chart, in trace order.
+const ZOOM_TRACES = {
+  distDaily: ['dist', 'distRoll'],
+  paceDaily: ['series', 'seriesRoll'],
+  rpeDaily: ['rpe'],
+  efficiency: ['eff']
+};
+let lastDv = null;
+
+function attachZoomResample(id){
+  document.getElementById(id).on('plotly_relayout', ev => {
+    const dv = lastDv;
+    if (!dv || dv.x.length <= LTTB_N) return;
+    const r0 = ev['xaxis.range[0]'], r1 = ev['xaxis.range[1]'];
+    if (r0 == null || r1 == null){
+      // Double-click / reset-axes autoranges without a range: put the
+      // full downsampled arrays back so autorange sees all the data.
+      if (ev['xaxis.autorange']){
+        const xs = [], ys = [], cds = [];
+        for (const key of ZOOM_TRACES[id]){
+          const t = maybeDs(dv, dv[key]);
+          xs.push(t.x); ys.push(t.y); cds.push(t.cd);
+        }
+        const upd = { x: xs, y: ys };
+        if (id === 'distDaily') upd.customdata = cds;
+        Plotly.restyle(id, upd);
+      }
+      return;
+    }
+    const xNum = ensureXNum(dv);
+    const lo = bisect(xNum, Date.parse(r0));
+    const hi = bisect(xNum, Date.parse(r1) + 1);
+    const xs = [], ys = [], cds = [];
+    for (const key of ZOOM_TRACES[id]){
+      const subX = xNum.slice(lo, hi);
+      const subY = Array.prototype.slice.call(dv[key], lo, hi);
+      const [dx, dy, di] = subX.length > LTTB_N ? lttb(subX, subY, LTTB_N) : [subX, subY, null];
+      xs.push(dx.map(ms => new Date(ms)));
+      ys.push(dy);
+      cds.push(di ? di.map(j => dv.idx[lo + j]) : dv.idx.slice(lo, hi));
+    }
+    const upd = { x: xs, y: ys };
+    if (id === 'distDaily') upd.customdata = cds;
+    Plotly.restyle(id, upd);
+  });
+}
+
+// Row indices per type, built once at load; day_idx is sorted, so date
+// bounds become binary searches instead of full predicate scans.
+let byTypeIndex = null;
+
+function bisectBy(idxArr, v){
+  let lo = 0, hi = idxArr.length;
+  while (lo < hi){
+    const mid = (lo + hi) >> 1;
+    if (DAILY.day_idx[idxArr[mid]] < v) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+}
+
+function filteredDaily(){
+  // DAILY is columnar; return the matching row indices.
+  const t = typeSelect.value;
+  const fromIdx = dayIdxOf(fromInput.value), toIdx = dayIdxOf(toInput.value);
+  if (t === '__ALL__'){
+    const di = DAILY.day_idx;
+    const lo = bisect(di, fromIdx), hi = bisect(di, toIdx + 1);
+    const idx = new Array(hi - lo);
+    for (let k = lo; k < hi; k++) idx[k - lo] = k;
+    return idx;
+  }
+  const tIdx = byTypeIndex.get(t) || [];
+  const lo = bisectBy(tIdx, fromIdx), hi = bisectBy(tIdx, toIdx + 1);
+  return tIdx.slice(lo, hi);
+}
+
+const derivedCache = new Map();
+let rendered = false;
+
+function keyOf(){
+  return [typeSelect.value, fromInput.value, toInput.value,
+          rollStatSel.value, rollWinSel.value, paceModeSel.value].join('|');
+}
+
+function derive(){
+  // Everything here depends only on the controls in keyOf(), not on LANG,
+  // so a language toggle can reuse the cached arrays untouched.
+  const k = keyOf();
+  let dv = derivedCache.get(k);
+  if (dv) return dv;
+
+  const idx = filteredDaily();
+  const W = +rollWinSel.value;
+  const stat = rollStatSel.value;
+  const paceMode = paceModeSel.value;
+
+  // One fused pass over the filtered rows fills every per-chart array;
+  // numeric columns go into Float64Arrays with NaN marking gaps.
+  const n = idx.length;
+  const x = new Array(n);
+  const dist = new Float64Array(n);
+  const pace = new Float64Array(n);
+  const speed = new Float64Array(n);
+  const rpe = new Float64Array(n);
+  const eff = new Float64Array(n);
+  // Bins are fixed at build time, so the histograms reduce to counting
+  // passes here; Plotly gets bar traces and never has to autobin.
+  const hb = HIST_BINS[paceMode === 'speed' ? 'speed' : 'pace'];
+  const hrb = HIST_BINS.hr;
+  const histY = new Float64Array(hb.n), hrY = new Float64Array(hrb.n);
+  for (let k = 0; k < n; k++){
+    const i = idx[k];
+    x[k] = dateStr(DAILY.day_idx[i]);
+    dist[k] = DAILY.dist_km[i] == null ? NaN : +DAILY.dist_km[i];
+    const p = DAILY.pace_minpkm[i] == null ? NaN : +DAILY.pace_minpkm[i];
+    pace[k] = p;
+    speed[k] = p > 0 ? 60.0 / p : NaN;
+    rpe[k] = DAILY.rpe[i] == null ? NaN : +DAILY.rpe[i];
+    const hr = DAILY.hr_avg[i] == null ? NaN : +DAILY.hr_avg[i];
+    eff[k] = speed[k] > 0 && hr > 0 ? speed[k] / hr : NaN;
+    if (!Number.isNaN(p)){
+      const v = paceMode === 'speed' ? speed[k] : p;
+      let b = Math.floor((v - hb.start) / hb.size);
+      histY[b < 0 ? 0 : b >= hb.n ? hb.n - 1 : b]++;
+    }
+    if (!Number.isNaN(hr)){
+      const b = Math.floor((hr - hrb.start) / hrb.size);
+      hrY[b < 0 ? 0 : b >= hrb.n ? hrb.n - 1 : b]++;
+    }
+  }
+
+  // Box data is pre-grouped by type at build time; slice each type's
+  // (sorted) day_idx to the date range instead of regrouping the rows.
+  const typeFilter = typeSelect.value;
+  const fromIdx = dayIdxOf(fromInput.value), toIdx = dayIdxOf(toInput.value);
+  const byType = {};
+  for (const tname of Object.keys(BOX_DATA)){
+    if (typeFilter !== '__ALL__' && tname !== typeFilter) continue;
+    const bd = BOX_DATA[tname];
+    const lo = bisect(bd.day_idx, fromIdx);
+    const hi = bisect(bd.day_idx, toIdx + 1);
+    if (hi <= lo) continue;
+    let vals = bd.pace.slice(lo, hi);
+    if (paceMode === 'speed') vals = vals.map(p => 60.0 / p);
+    byType[tname] = vals;
+  }
+  const series = paceMode === 'speed' ? speed : pace;
+  const distRoll = rolling(dist, W, stat);
+  const seriesRoll = rolling(series, W, stat);
+
+  const from = fromInput.value, to = toInput.value;
+  const weekX = [], weekVals = [];
+  for (let i = 0; i < WEEKLY.week.length; i++){
+    if (WEEKLY.week[i] >= from && WEEKLY.week[i] <= to){
+      weekX.push(WEEKLY.week[i]);
+      weekVals.push(WEEKLY.dist_km[i]);
+    }
+  }
+  const weekDist = Float64Array.from(weekVals);
+
+  dv = { idx, W, paceMode, x, dist, distRoll, series, seriesRoll, rpe, eff,
+         histY, hrY, byType, weekX, weekDist };
+  derivedCache.set(k, dv);
+  return dv;
+}
+
+function render(){
+  const S = STR[LANG];
+  // validate:false skips plotly's per-trace schema validation pass.
+  const cfg = { displayModeBar: false, responsive: true, validate: false };
+  const dv = derive();
+  lastDv = dv;
+  const { idx, W, paceMode, x, dist, distRoll, series, seriesRoll, rpe, eff,
+          histY, hrY, byType, weekX, weekDist } = dv;
+  const tDist = maybeDs(dv, dist), tDistRoll = maybeDs(dv, distRoll);
+  const tSeries = maybeDs(dv, series), tSeriesRoll = maybeDs(dv, seriesRoll);
+  const tRpe = maybeDs(dv, rpe), tEff = maybeDs(dv, eff);
+  const seriesTitle = paceMode === 'speed' ? S.speed : S.pace;
+  const rollName = W + 'd ' + S.roll;
+  const goal = +goalInput.value || 0;
+  // A horizontal line only needs its two endpoints.
+  const goalX = [weekX[0], weekX[weekX.length - 1]], goalY = [goal, goal];
+  const boxTraces = Object.keys(byType).sort().map(t => ({ y: byType[t], type: 'box', name: t }));
+
+  if (!rendered){
+    Plotly.react('distDaily', [
+      { x: tDist.x, y: tDist.y, customdata: tDist.cd, type: 'scattergl', mode: 'lines+markers', name: S.dist },
+      { x: tDistRoll.x, y: tDistRoll.y, customdata: tDistRoll.cd, type: 'scattergl', mode: 'lines', name: rollName, line: { dash: 'dot' } }
+    ], { title: S.dist, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+
+    Plotly.react('paceDaily', [
+      { x: tSeries.x, y: tSeries.y, type: 'scattergl', mode: 'lines+markers', name: seriesTitle },
+      { x: tSeriesRoll.x, y: tSeriesRoll.y, type: 'scattergl', mode: 'lines', name: rollName, line: { dash: 'dot' } }
+    ], { title: seriesTitle, margin: { t: 40 }, uirevision: 'keep',
+         yaxis: { autorange: paceMode === 'pace' ? 'reversed' : true } }, cfg);
+
+    Plotly.react('rpeDaily', [
+      { x: tRpe.x, y: tRpe.y, type: 'scattergl', mode: 'lines+markers', name: S.rpe }
+    ], { title: S.rpe, margin: { t: 40 }, uirevision: 'keep', yaxis: { range: [0, 10] } }, cfg);
+
+    Plotly.react('efficiency', [
+      { x: tEff.x, y: tEff.y, type: 'scattergl', mode: 'lines+markers', name: S.eff }
+    ], { title: S.eff, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+
+    Plotly.react('histPace', [
+      { x: binCenters(HIST_BINS[paceMode === 'speed' ? 'speed' : 'pace']), y: histY,
+        type: 'bar', name: seriesTitle }
+    ], { title: S.histPace, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+
+    Plotly.react('histHr', [
+      { x: binCenters(HIST_BINS.hr), y: hrY, type: 'bar', name: S.histHr }
+    ], { title: S.histHr, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+
+    Plotly.react('boxByType', boxTraces, { title: S.box, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+
+    Plotly.react('weeklyDist', [
+      { x: weekX, y: weekDist, type: 'bar', name: S.weekly },
+      { x: goalX, y: goalY, mode: 'lines',
+        name: S.goalLine, hoverinfo: 'skip', line: { color: '#d62728', dash: 'dash' } }
+    ], { title: S.weekly, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+
+    document.getElementById('distDaily').on('plotly_click', data => {
+      const i = data.points[0].customdata;
+      if (i != null){
+        noteBox.textContent = dateStr(DAILY.day_idx[i]) + ' · ' + typeOf(i) +
+          ' · ' + (DAILY.notes[i] || '-');
+      }
+    });
+    Object.keys(ZOOM_TRACES).forEach(attachZoomResample);
+  } else {
+    // Charts already exist: push new data/axes in place instead of a
+    // teardown-and-rebuild per Apply.
+    Plotly.restyle('distDaily', { x: [tDist.x, tDistRoll.x], y: [tDist.y, tDistRoll.y],
+                                  customdata: [tDist.cd, tDistRoll.cd],
+                                  name: [S.dist, rollName] });
+    Plotly.relayout('distDaily', { title: S.dist, 'xaxis.autorange': true, 'yaxis.autorange': true });
+    Plotly.restyle('paceDaily', { x: [tSeries.x, tSeriesRoll.x], y: [tSeries.y, tSeriesRoll.y],
+                                  name: [seriesTitle, rollName] });
+    Plotly.relayout('paceDaily', { title: seriesTitle, 'xaxis.autorange': true,
+                                   'yaxis.autorange': paceMode === 'pace' ? 'reversed' : true });
+    Plotly.restyle('rpeDaily', { x: [tRpe.x], y: [tRpe.y], name: [S.rpe] });
+    Plotly.relayout('rpeDaily', { title: S.rpe, 'xaxis.autorange': true });
+    Plotly.restyle('efficiency', { x: [tEff.x], y: [tEff.y], name: [S.eff] });
+    Plotly.relayout('efficiency', { title: S.eff, 'xaxis.autorange': true, 'yaxis.autorange': true });
+    Plotly.restyle('histPace', { x: [binCenters(HIST_BINS[paceMode === 'speed' ? 'speed' : 'pace'])],
+                                 y: [histY], name: [seriesTitle] });
+    Plotly.relayout('histPace', { title: S.histPace });
+    Plotly.restyle('histHr', { y: [hrY] });
+    Plotly.relayout('histHr', { title: S.histHr });
+    // Trace count can change with the type filter, so the box chart
+    // still goes through react.
+    Plotly.react('boxByType', boxTraces, { title: S.box, margin: { t: 40 }, uirevision: 'keep' }, cfg);
+    Plotly.restyle('weeklyDist', { x: [weekX, goalX], y: [weekDist, goalY],
+                                   name: [S.weekly, S.goalLine] });
+    Plotly.relayout('weeklyDist', { title: S.weekly, 'xaxis.autorange': true, 'yaxis.autorange': true });
+  }
+  noteBox.textContent = noteBox.textContent || S.clickHint;
+  rendered = true;
+}
+
+function relabel(){
+  // Language-only change: retitle charts in place, no data recompute.
+  // lastDv is what the charts actually show; the controls may have been
+  // edited since the last Apply and must not leak into the labels.
+  const S = STR[LANG];
+  const { W, paceMode } = lastDv;
+  const seriesTitle = paceMode === 'speed' ? S.speed : S.pace;
+  const rollName = W + 'd ' + S.roll;
+  Plotly.restyle('distDaily', { name: [S.dist, rollName] });
+  Plotly.relayout('distDaily', { title: S.dist });
+  Plotly.restyle('paceDaily', { name: [seriesTitle, rollName] });
+  Plotly.relayout('paceDaily', { title: seriesTitle });
+  Plotly.restyle('rpeDaily', { name: [S.rpe] });
+  Plotly.relayout('rpeDaily', { title: S.rpe });
+  Plotly.restyle('efficiency', { name: [S.eff] });
+  Plotly.relayout('efficiency', { title: S.eff });
+  Plotly.restyle('histPace', { name: [seriesTitle] });
+  Plotly.relayout('histPace', { title: S.histPace });
+  Plotly.relayout('histHr', { title: S.histHr });
+  Plotly.relayout('boxByType', { title: S.box });
+  Plotly.restyle('weeklyDist', { name: [S.weekly, S.goalLine] });
+  Plotly.relayout('weeklyDist', { title: S.weekly });
+}
+
+function applyLang(){
+  LANG = langSel.value;
+  const S = STR[LANG];
+  document.getElementById('pageTitle').textContent = S.title;
+  document.title = S.title;
+  document.getElementById('lblType').textContent = S.type;
+  document.getElementById('lblFrom').textContent = S.from;
+  document.getElementById('lblTo').textContent = S.to;
+  document.getElementById('lblPaceMode').textContent = S.paceMode;
+  document.getElementById('lblRollStat').textContent = S.rollStat;
+  document.getElementById('lblRollWin').textContent = S.rollWin;
+  document.getElementById('lblGoal').textContent = S.goal;
+  document.getElementById('lblLang').textContent = S.lang;
+  document.getElementById('applyBtn').textContent = S.apply;
+  // The click hint is language-bearing too; swap it unless a note is shown.
+  if (noteBox.textContent === STR.ko.clickHint || noteBox.textContent === STR.en.clickHint){
+    noteBox.textContent = S.clickHint;
+  }
+  fillTypeSelect();
+  if (rendered) relabel(); else render();
+}
+
+document.getElementById('applyBtn').addEventListener('click', render);
+langSel.addEventListener('change', applyLang);
+
+(async function init(){
+  const bytes = Uint8Array.from(atob(DAILY_B64), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  DAILY = await new Response(stream).json();
+  DAILY.day_idx = b64ToI32(DAILY.day_idx);
+  DAILY.type_codes = b64ToI8(DAILY.type_codes);
+  for (const c of ['dist_km', 'pace_minpkm', 'hr_avg', 'cadence_spm', 'rpe']){
+    DAILY[c] = b64ToF32(DAILY[c]);  // NaN marks missing values
+  }
+  byTypeIndex = new Map();
+  for (let i = 0; i < DAILY.type_codes.length; i++){
+    let a = byTypeIndex.get(typeOf(i));
+    if (!a) byTypeIndex.set(typeOf(i), a = []);
+    a.push(i);
+  }
+  if (INIT){
+    const idx = new Array(DAILY.day_idx.length);
+    for (let i = 0; i < idx.length; i++) idx[i] = i;
+    derivedCache.set(['__ALL__', DATE_MIN, DATE_MAX, 'mean', '7', 'pace'].join('|'),
+      Object.assign({ idx, W: 7, paceMode: 'pace' }, INIT));
+  }
+  applyLang();
+})();
+</script>
+</body>
+</html>
+"""
+
+# Split the template once at import, in sentinel order, so main() can stream
+# fragment/payload/fragment to the output file instead of building the full
+# page (payloads included) in memory through chained .replace() passes.
+_SENTINELS = ("__DAILY_B64__", "__WEEKLY__", "__BOX__", "__INIT__", "__HIST_BINS__",
+              "__BASE_DATE__", "__TYPES__", "__DATE_MIN__", "__DATE_MAX__")
+
+
+def _split_template(html, sentinels):
+    parts = []
+    rest = html
+    for s in sentinels:
+        pre, _, rest = rest.partition(s)
+        parts.append(pre)
+    parts.append(rest)
+    return parts
+
+
+_H_PARTS = _split_template(DASHBOARD_HTML, _SENTINELS)
+
+
+def main():
+    args = sys.argv[1:]
+    encoding = None
+    for a in list(args):
+        if a.startswith("--encoding="):
+            encoding = a.split("=", 1)[1]
+            args.remove(a)
+    csv_path = Path(args[0]) if args else DEFAULT_CSV
+    out_path = Path(args[1]) if len(args) > 1 else DEFAULT_OUT
+
+    df = detect_and_read_csv(csv_path, encoding=encoding)
+
+    df["date"] = pd.to_datetime(df["date"].astype(str).str.strip(), errors="coerce")
+    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
+
+    pace_raw = df["avg_pace"].astype("string").str.strip()
+    as_float = pd.to_numeric(pace_raw, errors="coerce")
+    mm_ss = pace_raw.str.extract(r"^(\d{1,2})\s*:\s*(\d{1,2})$")
+    mm = pd.to_numeric(mm_ss[0], errors="coerce")
+    ss = pd.to_numeric(mm_ss[1], errors="coerce")
+    from_mmss = (mm + ss / 60.0).where(ss < 60)
+    df["pace_minpkm"] = as_float.fillna(from_mmss).astype(float)
+    for col in ("dist_km", "hr_avg", "cadence_spm", "rpe"):
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df["type"] = df["type"].astype(str).str.strip().str.lower()
+
+    df["rpe"] = df["rpe"].fillna(df["type"].map(TYPE_RPE_DEFAULT))
+    meds = df.groupby("type")[["pace_minpkm", "hr_avg", "cadence_spm", "rpe"]].median()
+    df["pace_minpkm"] = impute_with_medians(df, "pace_minpkm", meds)
+    df["hr_avg"] = impute_with_medians(df, "hr_avg", meds)
+    df["cadence_spm"] = impute_with_medians(df, "cadence_spm", meds)
+    df["rpe"] = impute_with_medians(df, "rpe", meds)
+
+    # Ship dates as day offsets from the first run; 10-byte ISO strings per
+    # row bloat the payload and the JS rebuilds strings only where needed.
+    base = df["date"].min()
+    daily = df[["type", "dist_km", "pace_minpkm", "hr_avg",
+                "cadence_spm", "rpe", "notes"]].copy()
+    daily.insert(0, "day_idx", (df["date"] - base).dt.days.astype("int32"))
+    # Two decimals is plenty for km / min/km / bpm; anything more is just
+    # payload bytes.
+    num_cols = ["dist_km", "pace_minpkm", "hr_avg", "cadence_spm", "rpe"]
+    daily[num_cols] = daily[num_cols].round(2)
+
+    weekly = (
+        df.set_index("date")
+          .resample("W-MON", label="left", closed="left")
+          .agg(dist_km=("dist_km", "sum"), runs=("dist_km", "size"),
+               pace_minpkm=("pace_minpkm", "mean"), rpe=("rpe", "mean"))
+          .reset_index()
+          .rename(columns={"date": "week"})
+    )
+    weekly = weekly[weekly["runs"] > 0].reset_index(drop=True)
+    weekly["week"] = weekly["week"].dt.strftime("%Y-%m-%d")
+    weekly[["dist_km", "pace_minpkm", "rpe"]] = weekly[["dist_km", "pace_minpkm", "rpe"]].round(2)
+
+    types = sorted(df["type"].dropna().unique().tolist())
+
+    # Columnar (struct-of-arrays) payload: one array per column instead of
+    # repeating every key name on every row.
+    # Numeric daily columns ship as base64-encoded little-endian binary
+    # (float32 with NaN for missing, int32 for day_idx); only the string
+    # columns stay as JSON arrays.
+    def _b64col(values):
+        return base64.b64encode(values.tobytes()).decode("ascii")
+
+    # The low-cardinality type column ships as int8 category codes plus a
+    # small name table rather than one string per row.
+    type_cat = daily["type"].astype("category")
+    daily_soa = {
+        "day_idx": _b64col(daily["day_idx"].to_numpy("<i4")),
+        "type_names": type_cat.cat.categories.tolist(),
+        "type_codes": _b64col(type_cat.cat.codes.to_numpy("i1")),
+        "notes": daily["notes"].replace({np.nan: None}).tolist(),
+    }
+    for c in ("dist_km", "pace_minpkm", "hr_avg", "cadence_spm", "rpe"):
+        daily_soa[c] = _b64col(daily[c].to_numpy("<f4"))
+
+    weekly_clean = weekly.replace({np.nan: None})
+    weekly_soa = {col: weekly_clean[col].tolist() for col in weekly_clean.columns}
+    daily_json = dumps_json(daily_soa)
+    weekly_json = dumps_json(weekly_soa)
+
+    # Per-type box-plot inputs, grouped once here instead of per render.
+    box_data = {}
+    for t in types:
+        sub = daily[(daily["type"] == t) & daily["pace_minpkm"].notna()]
+        box_data[t] = {"day_idx": sub["day_idx"].tolist(),
+                       "pace": sub["pace_minpkm"].tolist()}
+    box_json = dumps_json(box_data)
+
+    # Partial evaluation of the first render: the derived arrays for the
+    # default controls (all types, full range, pace / mean / 7d) are computed
+    # here once and seeded into the client-side cache.
+    def _col(s):
+        return [None if pd.isna(v) else round(float(v), 3) for v in s]
+
+    # The client works from the decoded payload — round(2) then float32,
+    # widened back to float64 — so derive everything here from those same
+    # quantized values, not the raw df columns; otherwise the seeded cache
+    # entry differs from what derive() recomputes for identical controls.
+    q = daily[num_cols].astype("float32").astype("float64")
+    speed = 60.0 / q["pace_minpkm"]
+    eff = (speed / q["hr_avg"]).where((speed > 0) & (q["hr_avg"] > 0))
+
+    # Fixed histogram bins over the full dataset: the page counts filtered
+    # rows into these instead of letting Plotly autobin raw value arrays.
+    def _bin_spec(s, nbins=40):
+        v = s.dropna()
+        lo, hi = float(v.min()), float(v.max())
+        if lo == hi:
+            hi = lo + 1.0
+        return {"start": round(lo, 4), "size": round((hi - lo) / nbins, 6), "n": nbins}
+
+    def _hist_counts(s, spec):
+        edges = spec["start"] + spec["size"] * np.arange(spec["n"] + 1)
+        v = np.clip(s.dropna().to_numpy(dtype=float), edges[0], edges[-1])
+        return np.histogram(v, bins=edges)[0].tolist()
+
+    hist_bins = {
+        "pace": _bin_spec(q["pace_minpkm"]),
+        "speed": _bin_spec(speed),
+        "hr": _bin_spec(q["hr_avg"]),
+    }
+    init = {
+        "x": df["date"].dt.strftime("%Y-%m-%d").tolist(),
+        "dist": _col(q["dist_km"]),
+        "distRoll": _col(q["dist_km"].rolling(7, min_periods=1).mean()),
+        "series": _col(q["pace_minpkm"]),
+        "seriesRoll": _col(q["pace_minpkm"].rolling(7, min_periods=1).mean()),
+        "rpe": _col(q["rpe"]),
+        "eff": _col(eff),
+        "histY": _hist_counts(q["pace_minpkm"], hist_bins["pace"]),
+        "hrY": _hist_counts(q["hr_avg"], hist_bins["hr"]),
+        "byType": {t: box_data[t]["pace"] for t in box_data},
+        "weekX": weekly["week"].tolist(),
+        "weekDist": _col(weekly["dist_km"]),
+    }
+    init_json = dumps_json(init)
+
+    daily_b64 = base64.b64encode(gzip.compress(daily_json.encode("utf-8"))).decode("ascii")
+
+    fills = {
+        "__DAILY_B64__": daily_b64,
+        "__WEEKLY__": weekly_json,
+        "__BOX__": box_json,
+        "__INIT__": init_json,
+        "__HIST_BINS__": dumps_json(hist_bins),
+        "__BASE_DATE__": base.strftime("%Y-%m-%d"),
+        "__TYPES__": dumps_json(types),
+        "__DATE_MIN__": base.strftime("%Y-%m-%d"),
+        "__DATE_MAX__": df["date"].max().strftime("%Y-%m-%d"),
+    }
+    with open(out_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        for frag, key in zip(_H_PARTS, _SENTINELS):
+            f.write(frag)
+            f.write(fills[key])
+        f.write(_H_PARTS[-1])
+    print(f"wrote {out_path} ({len(daily)} runs, {len(weekly)} weeks)")
+
+
+if __name__ == "__main__":
+    main()